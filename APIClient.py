@@ -1,9 +1,30 @@
+from concurrent.futures import ThreadPoolExecutor
 from enum import Enum
+import functools
+import logging
 import os
+import time
 
+import jwt
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util import Retry
 import json
-import urllib
+
+try:
+    from requests_toolbelt.multipart.encoder import (
+        MultipartEncoder,
+        MultipartEncoderMonitor,
+    )
+except ImportError:
+    # optional, without it uploads are encoded in memory by requests
+    MultipartEncoder = None
+
+try:
+    import orjson
+except ImportError:
+    # optional, without it the standard json module is used
+    orjson = None
 
 import Utils
 from models.curation import Curation
@@ -82,9 +103,105 @@ OK = requests.codes.ok
 CREATED = requests.codes.created
 UNAUTHORIZED = requests.codes.unauthorized
 NOT_FOUND = requests.codes.not_found
+NOT_MODIFIED = requests.codes.not_modified
+
+# (connect, read) timeouts in seconds; transfers of files may take longer
+DEFAULT_TIMEOUT = (5, 30)
+TRANSFER_TIMEOUT = (5, 300)
+
+PAGE_SIZE = 50
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+# files larger than this are streamed from disk while uploading
+STREAM_UPLOAD_THRESHOLD = 4 * 1024 * 1024
+POOL_MAXSIZE = 16
+# seconds after a successful response during which we assume to be online
+LIVENESS_INTERVAL = 30
+# seconds after a successful response during which getStatus() does not check
+STATUS_CHECK_INTERVAL = 10
+# seconds before the expiry of the token at which it is renewed
+TOKEN_REFRESH_MARGIN = 30
+# seconds that the workspace and directory lists are cached
+LIST_CACHE_TTL = 30
+# seconds that the contents of a directory are cached, long enough to serve
+# the refreshes of a burst of file system events
+DIRECTORY_CACHE_TTL = 2
+# concurrent requests should never wait for a free connection in the pool
+MAX_WORKERS = min(8, POOL_MAXSIZE)
+
+# Idempotent requests are retried on gateway errors; the last response is
+# returned instead of raising so that the normal status handling applies.
+RETRY = Retry(
+    total=2,
+    backoff_factor=0.2,
+    status_forcelist=[502, 503, 504],
+    raise_on_status=False,
+)
+
+# Download URLs point to file storage, not to the API, so the session headers
+# meant for the API should not be sent along.
+NO_API_HEADERS = {
+    "Accept": None,
+    "Authorization": None,
+    "X-Lens-Source": None,
+    "X-Lens-Version": None,
+}
+
+
+def _dumps(obj):
+    """Serialize obj to JSON for a request body."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj)
+
+
+def _loads(response):
+    """Deserialize the JSON body of a response."""
+    if orjson is not None:
+        return orjson.loads(response.content)
+    return response.json()
+
+
+def _loads_bytes(content):
+    """Deserialize JSON from bytes."""
+    if orjson is not None:
+        return orjson.loads(content)
+    return json.loads(content)
+
+
+# Identical response bodies (for example when refreshing a view) result in the
+# same objects without decoding and constructing the dataclasses again.  The
+# objects are shared between callers, so they should be treated as read-only.
+@functools.lru_cache(maxsize=256)
+def _file_from_bytes(content):
+    return File.from_json(_loads_bytes(content))
+
+
+@functools.lru_cache(maxsize=256)
+def _share_links_from_bytes(content):
+    return tuple(ShareLink.from_json(item) for item in _loads_bytes(content)["data"])
 
 
 class APIClient:
+    # default query parameters of the list endpoints, the caller's params
+    # take precedence
+    _PAGINATION = {"$limit": PAGE_SIZE, "$skip": 0}
+    _PAG_MODELS = {**_PAGINATION, "isSharedModel": "false"}
+    _PAG_FILES = {**_PAGINATION, "isSystemGenerated": "false"}
+
+    # must not be modified, it is shared by all calls
+    _JSON_CT = {"Content-Type": "application/json"}
+
+    # endpoint prefixes for the resources that are addressed by id
+    _EP_MODELS = "models/"
+    _EP_FILE = "file/"
+    _EP_UPLOAD = "upload/"
+    _EP_SHARED_MODELS = "shared-models/"
+    _EP_WORKSPACES = "workspaces/"
+    _EP_DIRECTORIES = "directories/"
+    _EP_ORGANIZATIONS = "organizations/"
+    _EP_PREFERENCES = "preferences/"
+    _EP_SECONDARY_REFS = "org-secondary-references/"
+
     def __init__(
         self,
         parent,
@@ -98,22 +215,48 @@ class APIClient:
         user=None,
     ):
         self.base_url = api_url
+        # the API url may or may not end with a slash
+        self._base = self.base_url.rstrip("/") + "/"
         self.lens_url = lens_url
         self.source = source
         self.version = version
         self.parent = parent
         self.status = ConnStatus.DISCONNECTED
 
+        # A single session reuses connections to the API (keep-alive) instead
+        # of setting up a new TCP/TLS connection for each call.
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=4, pool_maxsize=POOL_MAXSIZE, max_retries=RETRY
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update(
+            {
+                "Accept": "application/json",
+                "X-Lens-Source": self.source,
+                "X-Lens-Version": self.version,
+            }
+        )
+        self._executor = ThreadPoolExecutor(max_workers=MAX_WORKERS)
+
+        # key -> (time stored, value), see _cached()
+        self._cache = {}
+        # key -> (ETag, value), see _request_with_etag()
+        self._etag_cache = {}
+        # time of the last successful response, see _properly_throw_if_offline()
+        self._last_ok = 0.0
+
         if access_token is None:
             self.email = email
             self.password = password
-            self.access_token = None
+            self._set_access_token(None)
             self.user = None
             self.setStatus(ConnStatus.LOGGED_OUT)
         else:
             self.email = None
             self.password = None
-            self.access_token = access_token
+            self._set_access_token(access_token)
             self.user = user
             self.setStatus(ConnStatus.CONNECTED)
 
@@ -125,9 +268,11 @@ class APIClient:
     def getStatus(self):
         """
         Gets the current connection status;
-        This is an active check to see if really online.
+        This is an active check to see if really online, unless there has been
+        a successful response very recently.
         """
-        self._confirm_online()
+        if time.monotonic() - self._last_ok >= STATUS_CHECK_INTERVAL:
+            self._confirm_online()
         return self.status
 
     def getNameUser(self):
@@ -138,10 +283,24 @@ class APIClient:
     def logout(self):
         self.email = None
         self.password = None
-        self.access_token = None
+        self._set_access_token(None)
         self.user = None
+        self._cache.clear()
+        self._etag_cache.clear()
+        # drop the pooled connections, new ones are created on demand
+        self.session.close()
         self.setStatus(ConnStatus.LOGGED_OUT)
 
+    def close(self):
+        """Release the pooled connections and the worker threads."""
+        self._executor.shutdown(wait=False)
+        self.session.close()
+
+    def __del__(self):
+        # the client is replaced on every login, do not keep its pool alive
+        if hasattr(self, "session"):
+            self.close()
+
     def is_logged_in(self):
         """Whether a user is logged in.
 
@@ -158,13 +317,19 @@ class APIClient:
         return self.is_logged_in() and self.status == ConnStatus.CONNECTED
 
     def authRequired(func):
+        @functools.wraps(func)
         def wrapper(self, *args, **kwargs):
-            if not self.access_token:
+            if self.access_token is None or self._token_expires_soon():
                 self.authenticate()
-
-            result = func(self, *args, **kwargs)
-
-            return result
+            try:
+                return func(self, *args, **kwargs)
+            except APIClientAuthenticationException:
+                # the token may be rejected before it expires, if we have the
+                # credentials, authenticate again and try once more
+                if not self.email:
+                    raise
+                self.authenticate()
+                return func(self, *args, **kwargs)
 
         return wrapper
 
@@ -175,46 +340,93 @@ class APIClient:
             # that explictely requires auth when purposefully logged out
             raise APIClientLoggedOutException("not logged in")
 
+        # a token that is already set is renewed, see authRequired
+        renewed = self.access_token is not None
         payload = {
             "strategy": "local",
             "email": self.email,
             "password": self.password,
         }
 
-        headers = self._set_content_type()
-        data = self._post(endpoint, headers=headers, data=json.dumps(payload))
-        self.access_token = data["accessToken"]
+        data = self._post(endpoint, json=payload)
+        self._set_access_token(data["accessToken"])
         self.user = data["user"]
         self.setStatus(ConnStatus.CONNECTED)
+        if renewed and hasattr(self.parent, "token_renewed"):
+            # the parent stores the token and tracks its expiry
+            self.parent.token_renewed()
+
+    def _token_expires_soon(self):
+        """Whether the token expires soon and can be renewed."""
+        # without credentials the token cannot be renewed, the user has to
+        # log in again when it expires
+        return (
+            bool(self.email)
+            and self._token_exp is not None
+            and time.time() > self._token_exp - TOKEN_REFRESH_MARGIN
+        )
+
+    def _set_access_token(self, access_token):
+        """
+        Set the access token and the matching Authorization header.
+
+        The header is a default header of the session, so it is sent along with
+        every request without building it per call.
+        """
+        self.access_token = access_token
+        self._token_exp = None
+        if access_token is None:
+            self._auth_header = None
+            self.session.headers.pop("Authorization", None)
+        else:
+            self._auth_header = f"Bearer {access_token}"
+            self.session.headers["Authorization"] = self._auth_header
+            try:
+                # the server verifies the token, here we only need the expiry
+                claims = jwt.decode(
+                    access_token,
+                    options={
+                        "verify_signature": False,
+                        "verify_exp": False,
+                        "verify_aud": False,
+                    },
+                )
+                self._token_exp = claims.get("exp")
+            except jwt.exceptions.PyJWTError:
+                logger.debug("Cannot decode the expiry of the access token")
 
     def _raiseException(self, response, **kwargs):
         "Raise a generic exception based on the status code"
+        # parse the body only once, it may not be JSON (for example the HTML
+        # page of a proxy error) so only a short part of the text is reported
+        body = None
+        if "json" in response.headers.get("Content-Type", ""):
+            try:
+                body = _loads(response)
+            except ValueError:
+                pass
+        text = response.text[:200]
+        if isinstance(body, dict):
+            message = str(body.get("message", text))
+        else:
+            message = text
+
         # dumps only when debugging is enabled
-        self._dump_response(response, **kwargs)
+        self._dump_response(response, body=body, **kwargs)
         raise APIClientRequestException(
-            f"API request failed with status code {response.status_code}: "
-            + response.json()["message"]
+            f"API request failed with status code {response.status_code}: " + message
         )
 
-    def _set_default_headers(self, headers):
-        headers["Authorization"] = f"Bearer {self.access_token}"
-        headers["Accept"] = "application/json"
-        headers["X-Lens-Source"] = self.source
-        headers["X-Lens-Version"] = self.version
-
-        return headers
-
-    def _set_content_type(self):
-        headers = {"Content-Type": "application/json"}
-        return headers
-
     def _confirm_online(self):
         """
         Calls lens api root to simply check if online.
         If not online, updates status.
         """
         try:
-            requests.get(f"{self.base_url}/")
+            # HEAD avoids downloading the body of the root
+            response = self.session.head(self._base, timeout=2, allow_redirects=False)
+            if response.status_code < 400:
+                self._last_ok = time.monotonic()
             if self.is_logged_in():
                 self.setStatus(ConnStatus.CONNECTED)
             else:
@@ -223,30 +435,63 @@ class APIClient:
             if e.response is None:
                 self.setStatus(ConnStatus.DISCONNECTED)
 
+    def _url(self, endpoint):
+        return self._base + endpoint.lstrip("/")
+
+    def _mark_online(self):
+        """Record a successful response, which proves that we are online."""
+        self._last_ok = time.monotonic()
+        if self.status == ConnStatus.DISCONNECTED:
+            if self.is_logged_in():
+                self.setStatus(ConnStatus.CONNECTED)
+            else:
+                self.setStatus(ConnStatus.LOGGED_OUT)
+
     def _confirm_online_after_exception(self):
         self._confirm_online()
         if self.status == ConnStatus.DISCONNECTED:
             raise APIClientOfflineException("Disconnected from service: logged out")
 
     def _properly_throw_if_offline(self):
-        if self.status == ConnStatus.DISCONNECTED:
+        # only try to connect again if there has not been a successful response
+        # recently, otherwise the request itself will tell whether we are online
+        if (
+            self.status == ConnStatus.DISCONNECTED
+            and time.monotonic() - self._last_ok > LIVENESS_INTERVAL
+        ):
             self._confirm_online()  # try to connect again
             if self.status == ConnStatus.DISCONNECTED:
                 raise APIClientOfflineException("Disconnected from service: logged out")
 
-    def _delete(self, endpoint, headers={}, params=None):
-        headers = self._set_default_headers(headers)
+    def _delete_id(self, prefix, _id, invalidate=None):
+        """
+        Delete the resource _id of the endpoint prefix, e.g. _EP_MODELS.
+
+        If given, the cached values with keys starting with invalidate are
+        removed, see _invalidate().
+        """
+        if invalidate is not None:
+            self._invalidate(invalidate)
+        return self._delete(prefix + _id)
 
+    def _delete(self, endpoint, headers=None, params=None):
         try:
-            response = requests.delete(
-                f"{self.base_url}/{endpoint}", params=params, headers=headers
+            response = self.session.delete(
+                self._url(endpoint),
+                params=params,
+                headers=headers,
+                timeout=DEFAULT_TIMEOUT,
             )
+        except requests.exceptions.ReadTimeout as e:
+            # the server was reached, so there is no need to check if online
+            raise APIClientConnectionError(e)
         except requests.exceptions.RequestException as e:
             self._confirm_online_after_exception()
             raise APIClientConnectionError(e)
 
         if response.status_code == OK:
-            return response.json()
+            self._mark_online()
+            return _loads(response)
         elif response.status_code == NOT_FOUND:
             raise APIClientNotFoundException(f"item not found {endpoint}")
         else:
@@ -254,19 +499,188 @@ class APIClient:
                 response, endpoint=endpoint, headers=headers, params=params
             )
 
-    def _request(self, endpoint, headers={}, params=None):
+    def _request_id(self, prefix, _id, **kwargs):
+        """Request the resource _id of the endpoint prefix, e.g. _EP_MODELS."""
+        return self._request(prefix + _id, **kwargs)
+
+    def _request(self, endpoint, headers=None, params=None, raw=False):
         self._properly_throw_if_offline()
-        headers = self._set_default_headers(headers)
         try:
-            response = requests.get(
-                f"{self.base_url}/{endpoint}", headers=headers, params=params
+            response = self.session.get(
+                self._url(endpoint),
+                headers=headers,
+                params=params,
+                timeout=DEFAULT_TIMEOUT,
             )
+        except requests.exceptions.ReadTimeout as e:
+            # the server was reached, so there is no need to check if online
+            raise APIClientConnectionError(e)
         except requests.exceptions.RequestException as e:
             self._confirm_online_after_exception()
             raise APIClientConnectionError(e)
 
+        return self._get_result(response, endpoint, headers, params, raw)
+
+    def _request_async(self, endpoint, headers=None, params=None):
+        """
+        Start a GET request in the background.
+
+        Returns a Future of the response that should be passed to
+        _get_async_result() to obtain the result.
+        """
+        return self._executor.submit(
+            self.session.get,
+            self._url(endpoint),
+            headers=headers,
+            params=params,
+            timeout=DEFAULT_TIMEOUT,
+        )
+
+    def _get_async_result(self, future, endpoint, headers=None, params=None):
+        """
+        Wait for a request started by _request_async() and return its result.
+
+        The response is handled in the calling thread, so status changes are
+        not made from the background thread.
+        """
+        try:
+            response = future.result()
+        except requests.exceptions.ReadTimeout as e:
+            # the server was reached, so there is no need to check if online
+            raise APIClientConnectionError(e)
+        except requests.exceptions.RequestException as e:
+            self._confirm_online_after_exception()
+            raise APIClientConnectionError(e)
+        return self._get_result(response, endpoint, headers, params)
+
+    def _request_many(self, endpoint, params_list, headers=None):
+        """
+        Perform a GET request for each of the params concurrently.
+
+        The results are returned in the order of params_list.
+        """
+        self._properly_throw_if_offline()
+        futures = [
+            self._request_async(endpoint, headers, params) for params in params_list
+        ]
+        return [
+            self._get_async_result(future, endpoint, headers, params)
+            for future, params in zip(futures, params_list)
+        ]
+
+    def _request_pages(self, endpoint, params, pages, headers=None):
+        """
+        Request a number of consecutive pages of a paginated endpoint.
+
+        The pages are retrieved concurrently and the data of all pages is
+        returned as one list.  If pages is None, all pages are retrieved: the
+        first page tells the total and the remaining pages are retrieved
+        concurrently.
+        """
+        if pages == 1:
+            return self._request(endpoint, headers, params)["data"]
+
+        limit = int(params["$limit"])
+        skip = int(params["$skip"])
+        if pages is None:
+            first = self._request(endpoint, headers, params)
+            params_list = [
+                {**params, "$skip": s}
+                for s in range(skip + limit, first["total"], limit)
+            ]
+            results = [first] + self._request_many(endpoint, params_list, headers)
+        else:
+            params_list = [{**params, "$skip": skip + i * limit} for i in range(pages)]
+            results = self._request_many(endpoint, params_list, headers)
+        return [item for result in results for item in result["data"]]
+
+    def _request_with_etag(self, endpoint, params=None, raw=False):
+        """
+        Perform a GET request that is revalidated with the server.
+
+        If the server returned an ETag for the previous result, the server
+        can respond with 304 Not Modified and the previous result is returned.
+        """
+        key = (endpoint, tuple(sorted((params or {}).items())), raw)
+        cached = self._etag_cache.get(key)
+        headers = {"If-None-Match": cached[0]} if cached else {}
+
+        self._properly_throw_if_offline()
+        try:
+            response = self.session.get(
+                self._url(endpoint),
+                headers=headers,
+                params=params,
+                timeout=DEFAULT_TIMEOUT,
+            )
+        except requests.exceptions.ReadTimeout as e:
+            # the server was reached, so there is no need to check if online
+            raise APIClientConnectionError(e)
+        except requests.exceptions.RequestException as e:
+            self._confirm_online_after_exception()
+            raise APIClientConnectionError(e)
+
+        if cached and response.status_code == NOT_MODIFIED:
+            self._mark_online()
+            return cached[1]
+        result = self._get_result(response, endpoint, headers, params, raw)
+        etag = response.headers.get("ETag")
+        if etag:
+            self._etag_cache[key] = (etag, result)
+        return result
+
+    def _cached(self, key, ttl, func, use_cache=True):
+        """
+        Return the cached value for key if it is younger than ttl seconds.
+
+        Otherwise, or if use_cache is False, call func() and cache its result.
+        """
+        cached = self._cache.get(key)
+        now = time.monotonic()
+        if use_cache and cached and now - cached[0] < ttl:
+            return cached[1]
+        value = func()
+        self._cache[key] = (now, value)
+        return value
+
+    def _invalidate(self, prefix):
+        """Remove the cached values with a key that starts with prefix."""
+        for key in [key for key in self._cache if key.startswith(prefix)]:
+            del self._cache[key]
+
+    def _list(
+        self, endpoint, defaults, params, pages=1, cache_ttl=None, use_cache=True
+    ):
+        """
+        Return the data of a list endpoint, params override the defaults.
+
+        If cache_ttl is given, the data is cached for that many seconds under a
+        key that starts with the endpoint, see _invalidate().  With use_cache
+        False the data is retrieved anyway and the cache is updated.
+        """
+        params = {**defaults, **(params or {})}
+        if cache_ttl is None:
+            return self._request_pages(endpoint, params, pages)
+
+        key = f"{endpoint}:{sorted(params.items())}:{pages}"
+        data = self._cached(
+            key,
+            cache_ttl,
+            lambda: self._request_pages(endpoint, params, pages),
+            use_cache,
+        )
+        # a copy, the caller may modify the list
+        return list(data)
+
+    def _get_result(self, response, endpoint, headers, params, raw=False):
+        """
+        Return the decoded JSON body of a successful response.
+
+        If raw is True, the undecoded body is returned instead.
+        """
         if response.status_code == OK:
-            return response.json()
+            self._mark_online()
+            return response.content if raw else _loads(response)
         elif response.status_code == UNAUTHORIZED:
             raise APIClientAuthenticationException("Not authenticated")
         elif response.status_code == NOT_FOUND:
@@ -276,15 +690,38 @@ class APIClient:
                 response, endpoint=endpoint, headers=headers, params=params
             )
 
-    def _post(self, endpoint, headers={}, params=None, data=None, files=None):
+    def _json_body(self, headers, obj):
+        """Return the headers and the data to send obj as a JSON body."""
+        # _dumps instead of the json argument of requests to make use of orjson
+        return {**(headers or {}), **self._JSON_CT}, _dumps(obj)
+
+    def _post(
+        self,
+        endpoint,
+        headers=None,
+        params=None,
+        data=None,
+        files=None,
+        timeout=DEFAULT_TIMEOUT,
+        json=None,
+    ):
         self._properly_throw_if_offline()
-        headers = self._set_default_headers(headers)
+        if json is not None:
+            headers, data = self._json_body(headers, json)
         if endpoint == "authentication":
-            headers.pop("Authorization")
+            # never send a (stale) token along with the credentials
+            headers = {**(headers or {}), "Authorization": None}
         try:
-            response = requests.post(
-                f"{self.base_url}/{endpoint}", headers=headers, data=data, files=files
+            response = self.session.post(
+                self._url(endpoint),
+                headers=headers,
+                data=data,
+                files=files,
+                timeout=timeout,
             )
+        except requests.exceptions.ReadTimeout as e:
+            # the server was reached, so there is no need to check if online
+            raise APIClientConnectionError(e)
         except requests.exceptions.RequestException as e:
             self._confirm_online_after_exception()
             raise APIClientConnectionError(e)
@@ -294,7 +731,8 @@ class APIClient:
         # should be handled differently for the _authenticate function (for
         # example give the user another try to log in).
         if response.status_code in [CREATED, OK]:
-            return response.json()
+            self._mark_online()
+            return _loads(response)
         elif response.status_code == UNAUTHORIZED:
             raise APIClientAuthenticationException("Not authenticated")
         elif response.status_code == NOT_FOUND:
@@ -304,20 +742,28 @@ class APIClient:
                 response, endpoint=endpoint, headers=headers, data=data, files=files
             )
 
-    def _update(self, endpoint, headers={}, data=None, files=None):
+    def _update(self, endpoint, headers=None, data=None, files=None, json=None):
         self._properly_throw_if_offline()
-        headers = self._set_default_headers(headers)
-
+        if json is not None:
+            headers, data = self._json_body(headers, json)
         try:
-            response = requests.patch(
-                f"{self.base_url}/{endpoint}", headers=headers, data=data, files=files
+            response = self.session.patch(
+                self._url(endpoint),
+                headers=headers,
+                data=data,
+                files=files,
+                timeout=DEFAULT_TIMEOUT,
             )
+        except requests.exceptions.ReadTimeout as e:
+            # the server was reached, so there is no need to check if online
+            raise APIClientConnectionError(e)
         except requests.exceptions.RequestException as e:
             self._confirm_online_after_exception()
             raise APIClientConnectionError(e)
 
         if response.status_code in [CREATED, OK]:
-            return response.json()
+            self._mark_online()
+            return _loads(response)
         elif response.status_code == NOT_FOUND:
             raise APIClientNotFoundException(f"item not found {endpoint}")
         else:
@@ -328,64 +774,94 @@ class APIClient:
     def _download(self, url, filename):
         self._properly_throw_if_offline()
         try:
-            response = requests.get(url)
+            with self.session.get(
+                url, headers=NO_API_HEADERS, stream=True, timeout=TRANSFER_TIMEOUT
+            ) as response:
+                if response.status_code == OK:
+                    # Save file to workspace directory under the user name not
+                    # the unique name.  Stream to a temporary file first, so
+                    # that a failed download keeps the existing local file.
+                    partname = filename + ".part"
+                    try:
+                        with open(partname, "wb") as f:
+                            self._write_content(response, f)
+                        os.replace(partname, filename)
+                    except (requests.exceptions.RequestException, OSError):
+                        # do not leave a partially downloaded file behind
+                        if os.path.exists(partname):
+                            os.remove(partname)
+                        raise
+                    return True
+                else:
+                    self._raiseException(response, url=url, filename=filename)
         except requests.exceptions.RequestException as e:
             raise APIClientException(e)
 
-        if response.status_code == OK:
-            # Save file to workspace directory under the user name not the unique name
-            with open(filename, "wb") as f:
-                f.write(response.content)
-            return True
-        else:
-            self._raiseException(response, url=url, filename=filename)
-
     def _download_with_file_handle(self, url, fh):
         self._properly_throw_if_offline()
         try:
-            response = requests.get(url)
+            with self.session.get(
+                url, headers=NO_API_HEADERS, stream=True, timeout=TRANSFER_TIMEOUT
+            ) as response:
+                if response.status_code == OK:
+                    self._write_content(response, fh)
+                    return True
+                else:
+                    self._raiseException(
+                        response, url=url, status_code=response.status_code
+                    )
         except requests.exceptions.RequestException as e:
             raise APIClientException(e)
 
-        if response.status_code == OK:
-            fh.write(response.content)
-            return True
-        else:
-            self._raiseException(response, url=url, status_code=response.status_code)
+    def _write_content(self, response, fh):
+        """
+        Write the body of a streamed response to a file handle in chunks.
+
+        This avoids holding the whole file in memory.
+        """
+        for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+            fh.write(chunk)
+
+    def _dump_response(self, response, body=None, **kwargs):
+        """
+        Log the details of a response at debug level.
+
+        The body is the already parsed JSON body of the response, if any.
+        """
+        if not logger.isEnabledFor(logging.DEBUG):
+            return
 
-    def _dump_response(self, response, **kwargs):
-        # # make a dictionary out of the keyword arguments
-        # callData = {f"{k}": v for k, v in kwargs.items}
         logger.debug("XXXXXX Call Data XXXXXX")
         for key, value in kwargs.items():
-            logger.debug(f"{key} {value}")
+            logger.debug("%s %s", key, value)
         logger.debug("XXXXXXXXXXXXXXXXXXXXXXX")
 
         logger.debug(response)
-        logger.debug(f"Status code: {response.status_code}")
+        logger.debug("Status code: %s", response.status_code)
 
         # Access headers
-        logger.debug(f"Content-Type: {response.headers['Content-Type']}")
+        logger.debug("Content-Type: %s", response.headers.get("Content-Type"))
 
         # Access response body as text
-        logger.debug(f"Response body (text): {response.text}")
+        logger.debug("Response body (text): %s", response.text)
 
-        if response.headers["Content-Type"].startswith("application/json"):
-            # Access response body as JSON
-            logger.debug(f"Response body (JSON): {response.json()}")
+        if body is not None:
+            logger.debug("Response body (JSON): %s", body)
 
-    @authRequired
     def get_base_url(self):
         return self.lens_url
 
     # User/Authentication fuctions
 
-    @authRequired
     def get_user(self):
+        # the user is only known after authenticating
+        if self.access_token is None:
+            self.authenticate()
         return self.user
 
-    @authRequired
     def is_user_solo(self):
+        if self.access_token is None:
+            self.authenticate()
         return self.user["tier"] == "Solo"
 
     # @authRequired
@@ -397,49 +873,34 @@ class APIClient:
     # Model Functions
 
     @authRequired
-    def getModels(self, params=None):
-        paginationparams = {"$limit": 50, "$skip": 0, "isSharedModel": "false"}
-
-        endpoint = "models"
-        if params is None:
-            params = paginationparams
-        else:
-            params = {**params, **paginationparams}
-
-        result = self._request(endpoint, params=params)
-        models = result["data"]
-
-        return models
+    def getModels(self, params=None, pages=1):
+        return self._list("models", self._PAG_MODELS, params, pages)
 
     @authRequired
     def getModel(self, modelId):
-        endpoint = f"models/{modelId}"
-
-        result = self._request(endpoint)
-        return result
+        return self._request_id(self._EP_MODELS, modelId)
 
     @authRequired
     def createModel(self, fileId):
         logger.debug("Creating the model...")
         endpoint = "models"
 
-        headers = self._set_content_type()
         payload = {
             "fileId": fileId,
             "shouldStartObjGeneration": True,
             "createSystemGeneratedShareLink": False,
         }
 
-        result = self._post(endpoint, headers=headers, data=json.dumps(payload))
+        self._invalidate("directories")
+        result = self._post(endpoint, json=payload)
 
         return result
 
     @authRequired
     def regenerateModelObj(self, modelId, fileId):
         logger.debug("Regenerating the model OBJ... ")
-        endpoint = f"models/{modelId}"
+        endpoint = self._EP_MODELS + modelId
 
-        headers = self._set_content_type()
         payload = {
             # "shouldCommitNewVersion": True,
             "fileId": fileId,
@@ -447,61 +908,44 @@ class APIClient:
             # "createSystemGeneratedShareLink": False,
         }
 
-        result = self._update(endpoint, headers=headers, data=json.dumps(payload))
+        self._invalidate("directories")
+        result = self._update(endpoint, json=payload)
 
         return result
 
     @authRequired
     def deleteModel(self, _id):
-        endpoint = f"/models/{_id}"
-
-        result = self._delete(endpoint)
-        return result
+        return self._delete_id(self._EP_MODELS, _id)
 
     # File Objects functions
 
     @authRequired
-    def getFiles(self, params=None):
-        paginationparams = {"$limit": 50, "$skip": 0, "isSystemGenerated": "false"}
-        endpoint = "file"
-        if params is None:
-            params = paginationparams
-        else:
-            params = {**params, **paginationparams}
-
-        result = self._request(endpoint, params=params)
-        files = result["data"]
-
-        return files
+    def getFiles(self, params=None, pages=1):
+        return self._list("file", self._PAG_FILES, params, pages)
 
     @authRequired
     def get_file_version_details(
         self, file_id, version_id, public=False
     ) -> (File, FileVersion):
-        endpoint = f"file/{file_id}"
+        endpoint = self._EP_FILE + file_id
         if public:
             params = {"publicInfo": "true"}  # yes, a string, not a bool
             try:
-                file_json = self._request(endpoint, params=params)
+                content = self._request(endpoint, params=params, raw=True)
             except (
                 APIClientRequestException
             ):  # if public fails, fall back to a private attempt
-                file_json = self._request(endpoint)
+                content = self._request(endpoint, raw=True)
         else:
-            file_json = self._request(endpoint)
-        file = File.from_json(file_json)
-        version = None
-        for ver in file.versions:
-            if ver._id == version_id:
-                version = ver
-        return file, version
+            content = self._request(endpoint, raw=True)
+        file = _file_from_bytes(content)
+        return file, file.get_version(version_id)
 
     @authRequired
     def createFile(self, fileName, fileUpdatedAt, uniqueName, directory, workspace):
-        logger.debug(f"Creating file {fileName} in dir {directory}")
+        logger.debug("Creating file %s in dir %s", fileName, directory)
         endpoint = "file"
 
-        headers = self._set_content_type()
         payload = {
             "custFileName": fileName,
             "shouldCommitNewVersion": True,
@@ -515,7 +959,8 @@ class APIClient:
             "workspace": workspace,
         }
 
-        result = self._post(endpoint, headers=headers, data=json.dumps(payload))
+        self._invalidate("directories")
+        result = self._post(endpoint, json=payload)
 
         return result
 
@@ -523,10 +968,9 @@ class APIClient:
     def updateFileObj(
         self, fileId, fileUpdatedAt, uniqueFileName, directory, workspace, message
     ):
-        logger.debug(f"updatingFileObj {fileId} in dir {directory}")
-        endpoint = f"file/{fileId}"
+        logger.debug("updatingFileObj %s in dir %s", fileId, directory)
+        endpoint = self._EP_FILE + fileId
 
-        headers = self._set_content_type()
         payload = {
             "shouldCommitNewVersion": True,
             "version": {
@@ -538,37 +982,35 @@ class APIClient:
             "workspace": workspace,
         }
 
-        result = self._update(endpoint, headers=headers, data=json.dumps(payload))
+        self._invalidate("directories")
+        result = self._update(endpoint, json=payload)
 
         return result
 
     @authRequired
     def setVersionActive(self, fileId, versionId):
         logger.debug("setVersionActive")
-        endpoint = f"file/{fileId}"
+        endpoint = self._EP_FILE + fileId
 
-        headers = self._set_content_type()
         payload = {
             "shouldCheckoutToVersion": True,
             "versionId": versionId,
         }
 
-        result = self._update(endpoint, headers=headers, data=json.dumps(payload))
+        self._invalidate("directories")
+        result = self._update(endpoint, json=payload)
 
         return result
 
     @authRequired
     def deleteFile(self, fileId):
-        endpoint = f"file/{fileId}"
-
-        result = self._delete(endpoint)
-        return result
+        return self._delete_id(self._EP_FILE, fileId, invalidate="directories")
 
     #  Upload Functions
 
     @authRequired
     def uploadFileToServer(self, uniqueName, filename):
-        logger.debug(f"upload: {filename}")
+        logger.debug("upload: %s", filename)
         # files to be uploaded need to have a unique name generated with uuid
         # (use str(uuid.uuid4()) ) : test.fcstd ->
         # c4481734-c18f-4b8c-8867-9694ae2a9f5a.fcstd
@@ -585,13 +1027,41 @@ class APIClient:
                 "application/octet-stream",
             )
 
-            files = {"file": fileWithUniqueName}
-            result = self._post(endpoint, files=files)
+            if (
+                MultipartEncoder is not None
+                and os.path.getsize(filename) > STREAM_UPLOAD_THRESHOLD
+            ):
+                encoder = MultipartEncoderMonitor(
+                    MultipartEncoder(fields={"file": fileWithUniqueName}),
+                    self._get_upload_progress_logger(filename),
+                )
+                headers = {"Content-Type": encoder.content_type}
+                result = self._post(
+                    endpoint, headers=headers, data=encoder, timeout=TRANSFER_TIMEOUT
+                )
+            else:
+                files = {"file": fileWithUniqueName}
+                result = self._post(endpoint, files=files, timeout=TRANSFER_TIMEOUT)
             return result
 
+    def _get_upload_progress_logger(self, filename):
+        """Return a callback for a MultipartEncoderMonitor that logs per MiB."""
+        last_mib = 0
+
+        def log_progress(monitor):
+            nonlocal last_mib
+            mib = monitor.bytes_read // (1024 * 1024)
+            if mib > last_mib:
+                last_mib = mib
+                logger.debug(
+                    "upload %s: %s/%s bytes", filename, monitor.bytes_read, monitor.len
+                )
+
+        return log_progress
+
     @authRequired
     def downloadFileFromServer(self, uniqueFileName, pathFile):
-        endpoint = f"/upload/{uniqueFileName}"
+        endpoint = self._EP_UPLOAD + uniqueFileName
 
         response = self._request(endpoint)
         directory = os.path.dirname(pathFile)
@@ -608,29 +1078,22 @@ class APIClient:
 
     @authRequired
     def downloadFileFromServerUsingHandle(self, unique_filename, fh):
-        endpoint = f"/upload/{unique_filename}"
+        endpoint = self._EP_UPLOAD + unique_filename
         url_dict = self._request(endpoint)
         return self._download_with_file_handle(url_dict["url"], fh)
 
     # Shared Model Functions
 
     @authRequired
-    def getSharedModels(self, params=None):
+    def getSharedModels(self, params=None, pages=1):
         endpoint = "shared-models"
 
-        headers = self._set_content_type()
-        paginationparams = {"$limit": 50, "$skip": 0}
-
-        if params is None:
-            params = paginationparams
-        else:
-            params = {**params, **paginationparams}
+        params = {**self._PAGINATION, **(params or {})}
         if "pin" in params:
             if params["pin"] == "":
                 del params["pin"]
 
-        result = self._request(endpoint, headers, params)
-        return result["data"]
+        return self._request_pages(endpoint, params, pages, self._JSON_CT)
 
     def get_public_shared_models(self):
         """
@@ -638,7 +1101,6 @@ class APIClient:
 
         This is a public query. Returns list[ShareLink] sorted by creation date (most recent first)
         """
-        shared_models = []
         params = {
             "$limit": 25,
             "$skip": 0,
@@ -647,31 +1109,23 @@ class APIClient:
             "isActive": "true",
             "isThumbnailGenerated": "true",
         }
-        result = self._request("shared-models", {}, params)
-        dict_list = result["data"]
-        for item in dict_list:
-            new_sl = ShareLink.from_json(item)
-            shared_models.append(new_sl)
-        return shared_models
+        content = self._request_with_etag("shared-models", params, raw=True)
+        return list(_share_links_from_bytes(content))
 
     @authRequired
     def createSharedModel(self, params):
         endpoint = "shared-models"
 
-        headers = self._set_content_type()
-        result = self._post(endpoint, headers, data=json.dumps(params))
+        result = self._post(endpoint, json=params)
         return result
 
     @authRequired
     def getSharedModel(self, shareID):
-        endpoint = f"shared-models/{shareID}"
-
-        result = self._request(endpoint)
-        return result
+        return self._request_id(self._EP_SHARED_MODELS, shareID)
 
     @authRequired
     def updateSharedModel(self, sharedModelData):
-        endpoint = f"shared-models/{sharedModelData['_id']}"
+        endpoint = self._EP_SHARED_MODELS + sharedModelData["_id"]
         if "pin" in sharedModelData:
             if sharedModelData["pin"] == "":
                 del sharedModelData["pin"]
@@ -683,45 +1137,33 @@ class APIClient:
                 del sharedModelData["isActive"]
             del sharedModelData["isSystemGenerated"]
 
-        headers = self._set_content_type()
-        result = self._update(
-            endpoint, headers=headers, data=json.dumps(sharedModelData)
-        )
+        result = self._update(endpoint, json=sharedModelData)
 
         return result
 
     @authRequired
     def deleteSharedModel(self, ShareModelID):
-        endpoint = f"shared-models/{ShareModelID}"
-
-        result = self._delete(endpoint)
-        return result
+        return self._delete_id(self._EP_SHARED_MODELS, ShareModelID)
 
     # Workspace functions.
     @authRequired
-    def getWorkspaces(self, params=None):
-        paginationparams = {"$limit": 50, "$skip": 0}
-        endpoint = "workspaces"
-        if params is None:
-            params = paginationparams
-        else:
-            params = {**params, **paginationparams}
-
-        result = self._request(endpoint, params=params)
-        workspaces = result["data"]
-
-        return workspaces
+    def getWorkspaces(self, params=None, pages=1, use_cache=True):
+        return self._list(
+            "workspaces",
+            self._PAGINATION,
+            params,
+            pages,
+            cache_ttl=LIST_CACHE_TTL,
+            use_cache=use_cache,
+        )
 
     @authRequired
     def getWorkspace(self, workspaceID):
-        endpoint = f"workspaces/{workspaceID}"
-
-        result = self._request(endpoint)
-        return result
+        return self._request_id(self._EP_WORKSPACES, workspaceID)
 
     @authRequired
     def get_workspace_including_public(self, workspace_id):
-        endpoint = f"workspaces/{workspace_id}"
+        endpoint = self._EP_WORKSPACES + workspace_id
         result = None
         try:
             result = self._request(endpoint)
@@ -736,58 +1178,75 @@ class APIClient:
         logger.debug("Creating the workspace...")
         endpoint = "workspaces"
 
-        headers = self._set_content_type()
         payload = {
             "name": name,
             "description": description,
             "organizationId": organizationId,
         }
 
-        result = self._post(endpoint, headers=headers, data=json.dumps(payload))
+        self._invalidate("workspaces")
+        result = self._post(endpoint, json=payload)
 
         return result
 
     @authRequired
     def updateWorkspace(self, workspaceData):
-        endpoint = f"workspaces/{workspaceData['_id']}"
+        endpoint = self._EP_WORKSPACES + workspaceData["_id"]
 
-        headers = self._set_content_type()
-        result = self._update(endpoint, headers=headers, data=json.dumps(workspaceData))
+        self._invalidate("workspaces")
+        result = self._update(endpoint, json=workspaceData)
 
         return result
 
     @authRequired
     def deleteWorkspace(self, WorkspaceID):
-        endpoint = f"workspaces/{WorkspaceID}"
-
-        result = self._delete(endpoint)
-        return result
+        return self._delete_id(
+            self._EP_WORKSPACES, WorkspaceID, invalidate="workspaces"
+        )
 
     # Directory Functions
     @authRequired
-    def getDirectories(self, params=None):
-        paginationparams = {"$limit": 50, "$skip": 0}
-        endpoint = "directories"
-        if params is None:
-            params = paginationparams
-        else:
-            params = {**params, **paginationparams}
-
-        result = self._request(endpoint, params=params)
-        directories = result["data"]
-
-        return directories
+    def getDirectories(self, params=None, pages=1, use_cache=True):
+        return self._list(
+            "directories",
+            self._PAGINATION,
+            params,
+            pages,
+            cache_ttl=LIST_CACHE_TTL,
+            use_cache=use_cache,
+        )
 
     @authRequired
     def getDirectory(self, directoryID):
-        endpoint = f"directories/{directoryID}"
+        # the key starts with "directories" so that changes invalidate it
+        return self._cached(
+            self._EP_DIRECTORIES + directoryID,
+            DIRECTORY_CACHE_TTL,
+            lambda: self._request_id(self._EP_DIRECTORIES, directoryID),
+        )
+
+    @authRequired
+    def getDirectoryAsync(self, directoryID):
+        """
+        Start retrieving a directory in the background.
 
-        result = self._request(endpoint)
+        Returns a Future that should be passed to getDirectoryResult() in the
+        calling thread.
+        """
+        self._properly_throw_if_offline()
+        return self._request_async(self._EP_DIRECTORIES + directoryID)
+
+    def getDirectoryResult(self, directoryID, future):
+        """Return the directory requested with getDirectoryAsync()."""
+        endpoint = self._EP_DIRECTORIES + directoryID
+        result = self._get_async_result(future, endpoint)
+        # the same cache entry as getDirectory()
+        self._cache[endpoint] = (time.monotonic(), result)
         return result
 
     @authRequired
     def get_directory_including_public(self, directory_id):
-        endpoint = f"directories/{directory_id}"
+        endpoint = self._EP_DIRECTORIES + directory_id
         result = None
         try:
             result = self._request(endpoint)
@@ -804,7 +1263,6 @@ class APIClient:
         logger.debug("Creating the directory...")
         endpoint = "directories"
 
-        headers = self._set_content_type()
         payload = {
             "name": name,
             "workspace": workspace,
@@ -814,23 +1272,23 @@ class APIClient:
             },
         }
 
-        return self._post(endpoint, headers=headers, data=json.dumps(payload))
+        self._invalidate("directories")
+        return self._post(endpoint, json=payload)
 
     @authRequired
     def updateDirectory(self, directoryData):
-        endpoint = f"directories/{directoryData['_id']}"
+        endpoint = self._EP_DIRECTORIES + directoryData["_id"]
 
-        headers = self._set_content_type()
-        result = self._update(endpoint, headers=headers, data=json.dumps(directoryData))
+        self._invalidate("directories")
+        result = self._update(endpoint, json=directoryData)
 
         return result
 
     @authRequired
     def deleteDirectory(self, directoryID):
-        endpoint = f"directories/{directoryID}"
-
-        result = self._delete(endpoint)
-        return result
+        return self._delete_id(
+            self._EP_DIRECTORIES, directoryID, invalidate="directories"
+        )
 
     @authRequired
     def uploadPrefs(
@@ -841,14 +1299,32 @@ class APIClient:
         uniqueFileNameSystemConfig,
         fileNameSystemConfig,
     ):
-        endpoint = "preferences"
+        # Retrieve the organization while the payload is being built.  The
+        # organization is not taken from the cache because the preferencesId
+        # must be up to date.
+        orgEndpoint = self._EP_ORGANIZATIONS + orgId
+        self._properly_throw_if_offline()
+        orgFuture = self._request_async(orgEndpoint)
 
-        orgData = self.getOrganization(orgId)
+        userConfig = {
+            "fileName": fileNameUserConfig,
+            "uniqueFileName": uniqueFileNameUserConfig,
+            "additionalData": {},
+            "additionalKeysToSave": {},
+        }
+        systemConfig = {
+            "fileName": fileNameSystemConfig,
+            "uniqueFileName": uniqueFileNameSystemConfig,
+            "additionalData": {},
+            "additionalKeysToSave": {},
+        }
+
+        orgData = self._get_async_result(orgFuture, orgEndpoint)
 
         prefId = orgData.get("preferencesId")
 
         if prefId:
-            endpoint = f"preferences/{prefId}"
+            endpoint = self._EP_PREFERENCES + prefId
             payloadHeader = "shouldCommitNewVersion"
             payloadHeaderValue = True
             message = "Update preferences"
@@ -858,61 +1334,37 @@ class APIClient:
             payloadHeaderValue = orgId
             message = "Initial commit perferences"
 
-        headers = self._set_content_type()
+        userConfig["additionalData"]["message"] = message
         payload = {
             payloadHeader: payloadHeaderValue,
             "version": {
-                "files": [
-                    {
-                        "fileName": fileNameUserConfig,
-                        "uniqueFileName": uniqueFileNameUserConfig,
-                        "additionalData": {
-                            "message": message,
-                        },
-                        "additionalKeysToSave": {},
-                    },
-                    {
-                        "fileName": fileNameSystemConfig,
-                        "uniqueFileName": uniqueFileNameSystemConfig,
-                        "additionalData": {},
-                        "additionalKeysToSave": {},
-                    },
-                ],
+                "files": [userConfig, systemConfig],
             },
         }
 
+        # the organization refers to (new) preferences after the upload
+        self._cache.pop(f"org:{orgId}", None)
         if prefId:
-            return self._update(endpoint, headers=headers, data=json.dumps(payload))
+            return self._update(endpoint, json=payload)
         else:
-            return self._post(endpoint, headers=headers, data=json.dumps(payload))
+            return self._post(endpoint, json=payload)
 
     @authRequired
     def getOrganization(self, orgId):
-        endpoint = f"organizations/{orgId}"
+        endpoint = self._EP_ORGANIZATIONS + orgId
 
-        return self._request(endpoint)
+        return self._cached(f"org:{orgId}", 60, lambda: self._request(endpoint))
 
     @authRequired
     def downloadPrefs(self, prefId):
         if prefId:
-            endpoint = f"preferences/{prefId}"
-            return self._request(endpoint)
+            return self._request_id(self._EP_PREFERENCES, prefId)
         else:
             return None
 
     @authRequired
-    def getOrganizations(self, params=None):
-        paginationparams = {"$limit": 50, "$skip": 0}
-        endpoint = "organizations"
-        if params is None:
-            params = paginationparams
-        else:
-            params = {**params, **paginationparams}
-
-        result = self._request(endpoint, params=params)
-        organizations = result["data"]
-
-        return organizations
+    def getOrganizations(self, params=None, pages=1):
+        return self._list("organizations", self._PAGINATION, params, pages)
 
     def getOndselOrganization(self):
         endpoint = "organizations"
@@ -920,20 +1372,27 @@ class APIClient:
             "type": "Ondsel",
             "publicInfo": "true",
         }
-        result = self._request(endpoint, params=params)
+        result = self._cached(
+            "org:ondsel", 300, lambda: self._request(endpoint, params=params)
+        )
         organizationList = result["data"]
         return organizationList[0]
 
     @authRequired
     def getSecondaryRefs(self, orgSecondaryReferencesId):
-        endpoint = f"org-secondary-references/{orgSecondaryReferencesId}"
+        endpoint = self._EP_SECONDARY_REFS + orgSecondaryReferencesId
 
-        result = self._request(endpoint)
+        result = self._cached(
+            f"secondary-refs:{orgSecondaryReferencesId}",
+            60,
+            lambda: self._request(endpoint),
+        )
         return result
 
     def get_search_results(self, search_text, target=None):
         curations = []
-        params = {"text": urllib.parse.quote_plus(search_text)}
+        # requests encodes the params, so do not quote the text here
+        params = {"text": search_text}
         if target is not None:
             params["target"] = target
         result = self._request("keywords", params=params)
@@ -967,51 +1426,56 @@ class APIClient:
         return answer, response
 
 
+# templates for APIHelper.getFilter(), the values are filled in by the caller
+_MODELS_FILTER = dict.fromkeys(
+    [
+        "$limit",
+        "$skip",
+        "_id",
+        "userId",
+        "custFileName",
+        "uniqueFileName",
+        "createdAt",
+        "updatedAt",
+        "isSharedModel",
+        "sharedModelId",
+        "isSharedModelAnonymousType",
+    ]
+)
+_SHARED_MODEL_FILTER = dict.fromkeys(
+    ["$limit", "$skip", "_id", "userId", "cloneModelId", "isActive", "deleted"]
+)
+_FILTERS = {"models": _MODELS_FILTER, "shared-Mode": _SHARED_MODEL_FILTER}
+
+
 class APIHelper:
-    def __init__(self):
-        pass
+    "Namespace for the static filter helpers, it is not meant to be instantiated"
 
     @staticmethod
     def getFilter(objName):
-        if objName == "models":
-            return {
-                "$limit": None,
-                "$skip": None,
-                "_id": None,
-                "userId": None,
-                "custFileName": None,
-                "uniqueFileName": None,
-                "createdAt": None,
-                "updatedAt": None,
-                "isSharedModel": None,
-                "sharedModelId": None,
-                "isSharedModelAnonymousType": None,
-            }
-        elif objName == "shared-Mode":
-            return {
-                "$limit": None,
-                "$skip": None,
-                "_id": None,
-                "userId": None,
-                "cloneModelId": None,
-                "isActive": None,
-                "deleted": None,
-            }
+        template = _FILTERS.get(objName)
+        # a copy because the caller fills in the values
+        return None if template is None else dict(template)
 
     @staticmethod
     def filterFilter(data):
+        # filter each value only once and keep it if the result is not empty
         if isinstance(data, dict):
-            return {
-                key: APIHelper.filterFilter(value)
-                for key, value in data.items()
-                if value is not None and APIHelper.filterFilter(value)
-            }
+            result = {}
+            for key, value in data.items():
+                if value is not None:
+                    value = APIHelper.filterFilter(value)
+                    if value:
+                        result[key] = value
+            return result
         elif isinstance(data, list):
-            return [
-                APIHelper.filterFilter(item)
-                for item in data
-                if item is not None and APIHelper.filterFilter(item)
-            ]
+            result = []
+            for item in data:
+                if item is not None:
+                    item = APIHelper.filterFilter(item)
+                    if item:
+                        result.append(item)
+            return result
         else:
             return data
 
@@ -1024,6 +1488,15 @@ class APICallResult(Enum):
     GENERAL_ERROR = 5  # not good; and we don't have a useful reason to act on
 
 
+# exception class -> (APICallResult, whether to log the exception), exceptions
+# of other classes are logged and result in a general error
+_API_CALL_RESULTS = {
+    APIClientOfflineException: (APICallResult.DISCONNECTED, False),
+    APIClientLoggedOutException: (APICallResult.NOT_LOGGED_IN, False),
+    APIClientAuthenticationException: (APICallResult.PERMISSION_ISSUE, True),
+}
+
+
 def fancy_handle(func):
     """
     Handle a function that raises an APIClientException. It is very similar to
@@ -1044,19 +1517,14 @@ def fancy_handle(func):
     try:
         func()
         return APICallResult.OK
-    except APIClientOfflineException:
-        return APICallResult.DISCONNECTED
-    except APIClientLoggedOutException:
-        return APICallResult.NOT_LOGGED_IN
-    except APIClientRequestException as e:
-        logger.error(e)
-        return APICallResult.GENERAL_ERROR
-    except APIClientAuthenticationException as e:
-        logger.error(e)
-        return APICallResult.PERMISSION_ISSUE
-    except APIClientException as e:
-        logger.error(e)
-        return APICallResult.GENERAL_ERROR
     except Exception as e:
-        logger.error(e)
-        return APICallResult.GENERAL_ERROR
+        # the most specific class of the exception that has a known result
+        for cls in type(e).__mro__:
+            if cls in _API_CALL_RESULTS:
+                result, log = _API_CALL_RESULTS[cls]
+                break
+        else:
+            result, log = APICallResult.GENERAL_ERROR, True
+        if log:
+            logger.error(e)
+        return result
@@ -46,9 +46,16 @@ class WorkspaceListModel(QAbstractListModel):
     def set_api(self, api):
         self.api = api
 
-    def refreshModel(self):
+    def refreshModel(self, useCache=True):
+        """
+        Refresh the workspaces.
+
+        With useCache False, changes made by other clients are retrieved even
+        if the list has been retrieved recently.
+        """
+
         def try_get_workspaces_connected():
-            self.workspaces = self.api.getWorkspaces()
+            self.workspaces = self.api.getWorkspaces(pages=None, use_cache=useCache)
 
         self.beginResetModel()
         api_result = fancy_handle(try_get_workspaces_connected)
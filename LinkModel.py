@@ -88,7 +88,7 @@ class ShareLinkModel(QAbstractListModel):
         self.links = []
 
         params = {"cloneModelId": self.model_id}
-        shared_models = self.apiClient.getSharedModels(params=params)
+        shared_models = self.apiClient.getSharedModels(params=params, pages=None)
 
         for sm in shared_models:
             canExport = sm.get("canExportModel", True)
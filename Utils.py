@@ -3,6 +3,7 @@
 # * Copyright (c) 2023 Ondsel                                           *
 # *                                                                     *
 # ***********************************************************************
+import functools
 import inspect
 import os
 import math
@@ -111,15 +112,26 @@ def get_extension(name_file):
     return ext
 
 
+@functools.lru_cache(maxsize=None)
+def getOpenableExtensions():
+    """
+    Return the lower case extensions (without dot) FreeCAD can import.
+
+    The import types are registered when the modules are initialized at
+    start-up, so they are only retrieved once.
+    """
+    return frozenset(key.lower() for key in FreeCAD.getImportType())
+
+
 def isOpenableByFreeCAD(filename):
     "check if FreeCAD can handle this file type"
 
-    if os.path.isdir(filename):
+    if os.path.basename(filename).startswith("."):
         return False
-    if os.path.basename(filename)[0] == ".":
+    if get_extension(filename).lower() not in getOpenableExtensions():
         return False
-    extensions = [key.lower() for key in FreeCAD.getImportType().keys()]
-    return get_extension(filename).lower() in extensions
+    # only stat the file if the extension matches
+    return not os.path.isdir(filename)
 
 
 def is_freecad_document(name_file):
@@ -257,7 +269,8 @@ def get_version_from_package_file(packageFileStr):
 def get_latest_version_ondsel_es():
     # raises a RequestException
     response = requests.get(
-        "https://api.github.com/repos/Ondsel-Development/FreeCAD/releases/latest"
+        "https://api.github.com/repos/Ondsel-Development/FreeCAD/releases/latest",
+        timeout=5,
     )
 
     if response.status_code == requests.codes.ok:
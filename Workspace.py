@@ -1,13 +1,15 @@
 from PySide.QtCore import (
     QAbstractListModel,
-    Qt,
     QModelIndex,
+    Qt,
     Signal,
     QFileSystemWatcher,
     QThread,
+    QTimer,
 )
 from PySide.QtGui import QPixmap
 import Utils
+import math
 import os
 import shutil
 import uuid
@@ -41,6 +43,12 @@ logger = Utils.getLogger(__name__)
 
 NO_REFRESH = False
 
+# milliseconds to wait for more file system events before refreshing
+REFRESH_DELAY = 100
+
+# number of rows a view receives at a time, see WorkspaceModel.fetchMore()
+FETCH_BATCH_SIZE = 50
+
 
 class FileStatus(Enum):
     SERVER_ONLY = auto()
@@ -69,9 +77,10 @@ class TokenRefreshThread(QThread):
     token_refreshed = Signal()
 
     def run(self):
+        # the models refresh when created, so the first refresh is after a while
         while True:
-            self.token_refreshed.emit()
             self.sleep(600)
+            self.token_refreshed.emit()
 
 
 class WorkspaceModel(QAbstractListModel):
@@ -80,7 +89,6 @@ class WorkspaceModel(QAbstractListModel):
     IdRole = Qt.UserRole + 3
     NameStatusAndIsFolderRole = Qt.UserRole + 4
     StatusRole = Qt.UserRole + 5
-    subPath = ""
 
     def __init__(self, workspaceDict, **kwargs):
         parent = kwargs.get("parent", None)
@@ -95,77 +103,140 @@ class WorkspaceModel(QAbstractListModel):
         self.path = CACHE_PATH + self._id
         self.subPath = kwargs.get("subPath", "")
         self.files = []
+        # the number of files that are exposed to views as rows
+        self.rowsFetched = 0
+
+        # a burst of file system events (for example when copying several
+        # files) results in a single refresh
+        self.refreshTimer = QTimer(self)
+        self.refreshTimer.setSingleShot(True)
+        self.refreshTimer.setInterval(REFRESH_DELAY)
+        self.refreshTimer.timeout.connect(self.refreshModelInBackground)
 
         self.watcher = QFileSystemWatcher()
-        self.watcher.fileChanged.connect(self.refreshModel)
-        self.watcher.directoryChanged.connect(self.refreshModel)
-        self.watcher.addPath(self.path)
+        self.watcher.fileChanged.connect(self.scheduleRefresh)
+        self.watcher.directoryChanged.connect(self.scheduleRefresh)
+        # the current directory is watched once it is listed, see
+        # watchCurrentDirectory()
 
-    def clearModel(self):
+    def scheduleRefresh(self, path=None):
+        """Refresh the model once no file system events arrived for a while."""
+        # (re)starting the timer postpones the refresh
+        self.refreshTimer.start()
+
+    def setFiles(self, files):
+        """
+        Replace the files with a single reset of the model.
+
+        Only the first batch of files becomes rows right away, views request
+        the others with fetchMore() when they scroll to them.
+        """
         self.beginResetModel()
-        self.beginRemoveRows(QModelIndex(), 0, self.rowCount() - 1)
+        self.files = files
+        self.rowsFetched = min(len(files), FETCH_BATCH_SIZE)
         self.endResetModel()
 
+    def clearModel(self):
+        self.setFiles([])
+
     def refreshModel(self):
-        self.clearModel()
+        # a single reset of the model, a view redraws once
         if not os.path.isdir(self.path):
-            self.files = []
+            self.clearModel()
             return
         localDirs, localFiles = self.getLocalFiles()
-        self.beginResetModel()
-        self.files = self.sortFiles(localDirs, localFiles)
-        self.endResetModel()
+        self.setFiles(self.sortFiles(localDirs, localFiles))
+
+    def refreshModelInBackground(self):
+        """
+        Refresh the model without blocking on the server.
+
+        Used for refreshes that nobody waits for, such as file system events.
+        """
+        # only the local file system is involved
+        self.refreshModel()
+
+    def watchCurrentDirectory(self):
+        """Watch the current directory instead of the directories watched before."""
+        fullPath = self.getFullPath()
+        watched = self.watcher.directories()
+        if watched != [fullPath]:
+            # one call for all paths, avoid removing and adding the same path
+            stale = [path for path in watched if path != fullPath]
+            if stale:
+                self.watcher.removePaths(stale)
+            if fullPath not in watched:
+                self.watcher.addPath(fullPath)
 
     def getLocalFiles(self):
-        if not os.path.exists(self.getFullPath()):
-            os.makedirs(self.getFullPath())
-        files = os.listdir(self.getFullPath())
+        fullPath = self.getFullPath()
+        try:
+            entries = os.scandir(fullPath)
+        except FileNotFoundError:
+            # only create the directory when it is missing, which is rare
+            os.makedirs(fullPath, exist_ok=True)
+            entries = os.scandir(fullPath)
+        # the directory exists now, so it can be watched
+        self.watchCurrentDirectory()
         local_dirs = []
         local_files = []
 
-        for basename in files:
-            # First we filter the dirs
-            if os.path.isdir(
-                Utils.joinPath(self.getFullPath(), basename)
-            ) and not basename.startswith("."):
-                file_item = FileItem(
-                    basename,
-                    "",
-                    self.getFullPath(),
-                    True,
-                    [],
-                    "",
-                    "",
-                    "",
-                    "",
-                    {"name": basename},
-                )
-                local_dirs.append(file_item)
-
-        for basename in files:
-            # Then we add the files
-            file_path = Utils.joinPath(self.getFullPath(), basename)
-            if not os.path.isdir(file_path):
-                created_time = Utils.getFileCreatedAt(file_path)
-                modified_time = Utils.getFileUpdatedAt(file_path)
-                base, extension = os.path.splitext(basename)
-                if extension.lower() != ".fcbak":
-                    file_item = FileItem(
-                        basename,
-                        extension.lower(),
-                        self.getFullPath(),
-                        False,
-                        [basename],
-                        basename,
-                        created_time,
-                        modified_time,
-                        FileStatus.UNTRACKED,
-                    )
-                    local_files.append(file_item)
+        # scandir provides the type and the stat of the entries without
+        # additional system calls per entry
+        with entries:
+            for entry in entries:
+                basename = entry.name
+                if entry.is_dir():
+                    if not basename.startswith("."):
+                        file_item = FileItem(
+                            basename,
+                            "",
+                            fullPath,
+                            True,
+                            [],
+                            "",
+                            "",
+                            "",
+                            "",
+                            {"name": basename},
+                        )
+                        local_dirs.append(file_item)
+                else:
+                    base, extension = os.path.splitext(basename)
+                    if extension.lower() != ".fcbak":
+                        stat = entry.stat()
+                        # in milliseconds, see Utils.getFileCreatedAt()
+                        created_time = math.floor(stat.st_ctime * 1000)
+                        modified_time = math.floor(stat.st_mtime * 1000)
+                        file_item = FileItem(
+                            basename,
+                            extension.lower(),
+                            fullPath,
+                            False,
+                            [basename],
+                            basename,
+                            created_time,
+                            modified_time,
+                            FileStatus.UNTRACKED,
+                        )
+                        local_files.append(file_item)
         return local_dirs, local_files
 
     def rowCount(self, parent=None):
-        return len(self.files)
+        return self.rowsFetched
+
+    def canFetchMore(self, parent=None):
+        return self.rowsFetched < len(self.files)
+
+    def fetchMore(self, parent=None):
+        count = min(len(self.files) - self.rowsFetched, FETCH_BATCH_SIZE)
+        if count <= 0:
+            return
+        self.beginInsertRows(
+            QModelIndex(), self.rowsFetched, self.rowsFetched + count - 1
+        )
+        self.rowsFetched += count
+        self.endInsertRows()
 
     def data(self, index, role=Qt.DisplayRole):
         # logger.debug("WorkspaceModel.data()")
@@ -194,11 +265,21 @@ class WorkspaceModel(QAbstractListModel):
         else:
             return Utils.joinPath(self.name, self.subPath)
 
-    def getFullPath(self):
-        if self.subPath == "":
-            return self.path
+    @property
+    def subPath(self):
+        return self._subPath
+
+    @subPath.setter
+    def subPath(self, subPath):
+        self._subPath = subPath
+        # the full path is needed for every file item, so join it only once
+        if subPath == "":
+            self._fullPath = self.path
         else:
-            return Utils.joinPath(self.path, self.subPath)
+            self._fullPath = Utils.joinPath(self.path, subPath)
+
+    def getFullPath(self):
+        return self._fullPath
 
     def openDirectory(self, index):
         logger.debug("WorkspaceModel.openDirectory()")
@@ -243,28 +324,35 @@ class WorkspaceModel(QAbstractListModel):
         else:
             # The file may be represented only on the server in which case it
             # is empty from the filesystem perspective.
-            logger.debug(f"Dir {dirName} is not present locally")
+            logger.debug("Dir %s is not present locally", dirName)
             return True
 
-    def _delete(self, index, deleteFunc, checkFunc, kind, refresh):
+    def _delete(self, index, deleteFunc, isFolder, kind, refresh):
         # do not call refreshModel() as it may be part of a call from a subclass
-        fileName = self.data(index, WorkspaceModel.NameRole)
+        fileItem = self.files[index.row()]
 
-        fileName = Utils.joinPath(self.getFullPath(), fileName)
-        if os.path.exists(fileName):
-            if checkFunc(fileName):
-                deleteFunc(fileName)
-            else:
-                logger.error(f"{fileName} is not a {kind}")
+        fileName = Utils.joinPath(self.getFullPath(), fileItem.name)
+        # the type is known from the listing, so the path is not checked first
+        if fileItem.is_folder != isFolder:
+            logger.error("%s is not a %s", fileName, kind)
         else:
-            # apparently it was only represented on the server
-            logger.debug(f"{fileName} is not present locally")
+            try:
+                deleteFunc(fileName)
+            except FileNotFoundError:
+                # apparently it was only represented on the server
+                logger.debug("%s is not present locally", fileName)
+            except (NotADirectoryError, IsADirectoryError, PermissionError):
+                # the local type may differ from the listing, removing a
+                # directory as a file raises PermissionError on some platforms
+                if os.path.isdir(fileName) == isFolder:
+                    raise
+                logger.error("%s is not a %s", fileName, kind)
         if refresh:
             self.refreshModel()
 
     def deleteDirectory(self, index, refresh=True):
         """Delete a directory given an index."""
-        self._delete(index, shutil.rmtree, os.path.isdir, "directory", refresh)
+        self._delete(index, shutil.rmtree, True, "directory", refresh)
 
     def deleteFile(self, index, refresh=True):
         """Delete a file given an index.
@@ -272,7 +360,7 @@ class WorkspaceModel(QAbstractListModel):
         The method should not call refreshModel() as it may be combined with a
         method from a subclass.
         """
-        self._delete(index, os.remove, os.path.isfile, "file", refresh)
+        self._delete(index, os.remove, False, "file", refresh)
 
     def sortFiles(self, dirs, files, key=lambda fileItem: fileItem.name):
         return sorted(dirs, key=key) + sorted(files, key=key)
@@ -286,8 +374,7 @@ class WorkspaceModel(QAbstractListModel):
 
     def createDir(self, dir):
         fullPath = Utils.joinPath(self.getFullPath(), dir)
-        if not os.path.exists(fullPath):
-            os.makedirs(fullPath)
+        os.makedirs(fullPath, exist_ok=True)
 
     def dump(self):
         """
@@ -299,9 +386,22 @@ class WorkspaceModel(QAbstractListModel):
 
 
 class ServerWorkspaceModel(WorkspaceModel):
+    # emitted from a worker thread with the (directory, generation) and the
+    # Future of the request started by refreshModelInBackground()
+    serverDirectoryReceived = Signal(object, object)
+
     def __init__(self, workspaceDict, **kwargs):
         super().__init__(workspaceDict, **kwargs)
 
+        # a refresh in the background is in flight and another one is pending
+        self.refreshInFlight = False
+        self.refreshPending = False
+        # incremented by every blocking refresh, results of refreshes in the
+        # background that were started before are outdated
+        self.refreshGeneration = 0
+        # a queued connection, the slot runs in the thread of the model
+        self.serverDirectoryReceived.connect(self.refreshWithServerDirectory)
+
         # a stack of directories, the current directory is currentDirectory[-1]
         # (pushing is 'append()', popping is 'pop()')
         self.currentDirectory = [workspaceDict["rootDirectory"]]
@@ -310,11 +410,10 @@ class ServerWorkspaceModel(WorkspaceModel):
         self.refreshModel()
 
         # if the folder doesnt exist, create it
-        if not os.path.exists(self.path):
-            os.makedirs(self.path)
+        os.makedirs(self.path, exist_ok=True)
         # Create an instance of the token refresh thread
         self.refresh_thread = TokenRefreshThread()
-        self.refresh_thread.token_refreshed.connect(self.refreshModel)
+        self.refresh_thread.token_refreshed.connect(self.refreshModelInBackground)
         self.refresh_thread.start()
 
     def getServerDirs(self, serverDirDicts):
@@ -347,12 +446,13 @@ class ServerWorkspaceModel(WorkspaceModel):
         """
         createdDate = currentVersion["createdAt"]
         hasFileUpdatedAt = "fileUpdatedAt" in currentVersion["additionalData"]
-        logger.debug(f"has fileUpdatedAt? {hasFileUpdatedAt}")
+        logger.debug("has fileUpdatedAt? %s", hasFileUpdatedAt)
         updatedDate = currentVersion["additionalData"].get("fileUpdatedAt", createdDate)
         return updatedDate, createdDate
 
     def getServerFiles(self, serverFileDicts):
         serverFiles = []
+        fullPath = self.getFullPath()
         for serverFileDict in serverFileDicts:
             currentVersion = serverFileDict["currentVersion"]
 
@@ -362,7 +462,7 @@ class ServerWorkspaceModel(WorkspaceModel):
             file_item = FileItem(
                 custFileName,
                 extension.lower(),
-                self.getFullPath(),
+                fullPath,
                 False,
                 [custFileName],
                 custFileName,
@@ -377,19 +477,16 @@ class ServerWorkspaceModel(WorkspaceModel):
     def mergeFiles(self, serverFiles, localFiles, funcUpdateFound, funcUpdateNotFound):
         filesToAdd = []
 
-        # O(n^2) can be made more efficient with sorting and parallel iteration
-        # for now it suffices
+        # index the server files by name, the first one wins for duplicates
+        serverFilesByName = {}
+        for serverFile in serverFiles:
+            serverFilesByName.setdefault(serverFile.name, serverFile)
+
         for localFile in localFiles:
-            # logger.debug(f'serverFile: {localFile.name}')
-            for serverFile in serverFiles:
-                # logger.debug(f'localFile: {serverFile.name}')
-                if serverFile.name == localFile.name:
-                    # logger.debug(f'found {serverFile.name} locally')
-                    funcUpdateFound(serverFile, localFile)
-                    break
+            serverFile = serverFilesByName.get(localFile.name)
+            if serverFile is not None:
+                funcUpdateFound(serverFile, localFile)
             else:  # the server does not have this file
-                # Note that this 'else' is part of the 'for and not of the 'if'
-                # inside the 'for'
                 funcUpdateNotFound(localFile)
                 filesToAdd.append(localFile)
 
@@ -404,10 +501,58 @@ class ServerWorkspaceModel(WorkspaceModel):
 
         """
 
-        self.clearModel()
+        self.refreshGeneration += 1
+        currentDir = self.currentDirectory[-1]
+        self.refreshWithServerInfo(
+            lambda: self.apiClient.getDirectory(currentDir["_id"])
+        )
+
+    def refreshModelInBackground(self):
+        """
+        Refresh the model without blocking on the server.
+
+        The directory is retrieved by a worker thread and the model is
+        refreshed when it arrives, see refreshWithServerDirectory().
+        """
+        if self.refreshInFlight:
+            self.refreshPending = True
+            return
 
         currentDir = self.currentDirectory[-1]
+        future = None
+
+        def tryStartRequest():
+            nonlocal future
+            future = self.apiClient.getDirectoryAsync(currentDir["_id"])
+
+        if fancy_handle(tryStartRequest) != APICallResult.OK:
+            # show the local files
+            super().refreshModel()
+            return
+
+        self.refreshInFlight = True
+        generation = self.refreshGeneration
+        future.add_done_callback(
+            lambda f: self.serverDirectoryReceived.emit((currentDir, generation), f)
+        )
 
+    def refreshWithServerDirectory(self, request, future):
+        directory, generation = request
+        self.refreshInFlight = False
+        if self.refreshPending:
+            # the result may already be outdated
+            self.refreshPending = False
+            self.refreshModelInBackground()
+        elif generation == self.refreshGeneration:
+            self.refreshWithServerInfo(
+                lambda: self.apiClient.getDirectoryResult(directory["_id"], future)
+            )
+        # else the model has been refreshed (or navigated) in the meantime
+
+    def refreshWithServerInfo(self, getServerDirDict):
+        """
+        Refresh the model with the directory returned by getServerDirDict().
+        """
         # retrieve the dirs and files from the server
         # the directories are shown first and then the files
         serverDirDict = None
@@ -418,7 +563,7 @@ class ServerWorkspaceModel(WorkspaceModel):
             nonlocal serverDirDict
             nonlocal serverDirs
             nonlocal serverFiles
-            serverDirDict = self.apiClient.getDirectory(currentDir["_id"])
+            serverDirDict = getServerDirDict()
             serverDirs = self.getServerDirs(serverDirDict["directories"])
             serverFiles = self.getServerFiles(serverDirDict["files"])
 
@@ -460,9 +605,7 @@ class ServerWorkspaceModel(WorkspaceModel):
             serverFiles, localFiles, updateFileFound, updateFileNotFound
         )
 
-        self.beginResetModel()
-        self.files = self.sortFiles(dirs, files)
-        self.endResetModel()
+        self.setFiles(self.sortFiles(dirs, files))
 
         # This needs to be disabled unless we maintain our own file administration.
         # If a file is deleted on the server, the addon will automatically add it to
@@ -500,7 +643,9 @@ class ServerWorkspaceModel(WorkspaceModel):
             ):
                 thumbnailUrl = file_item.serverFileDict["thumbnailUrlCache"]
                 try:
-                    response = requests.get(thumbnailUrl)
+                    response = requests.get(
+                        thumbnailUrl, timeout=APIClient.DEFAULT_TIMEOUT
+                    )
                     image_data = response.content
                     pixmap = QPixmap()
                     pixmap.loadFromData(image_data)
@@ -543,7 +688,7 @@ class ServerWorkspaceModel(WorkspaceModel):
         else:
             # It may be the case that the file is only represented locally in
             # which case it is empty from the server perspective
-            logger.debug(f"Dir {fileItem.name} is not present on the server")
+            logger.debug("Dir %s is not present on the server", fileItem.name)
             return True
 
     def isEmptyDirectory(self, index):
@@ -572,7 +717,7 @@ class ServerWorkspaceModel(WorkspaceModel):
         super().deleteDirectory(index, NO_REFRESH)
         fileItem = self.files[index.row()]
         if fileItem.serverFileDict and "_id" in fileItem.serverFileDict:
-            logger.debug(f"doing an API delete on {fileItem.name}")
+            logger.debug("doing an API delete on %s", fileItem.name)
             api_result = fancy_handle(
                 lambda: self.apiClient.deleteDirectory(fileItem.serverFileDict["_id"])
             )
@@ -586,7 +731,7 @@ class ServerWorkspaceModel(WorkspaceModel):
             else:
                 raise Exception("Unknown API result")
         else:
-            logger.debug(f"Dir {fileItem.name} is not on the server.")
+            logger.debug("Dir %s is not on the server.", fileItem.name)
         self.refreshModel()
 
     def deleteFileLocally(self, index):
@@ -602,7 +747,7 @@ class ServerWorkspaceModel(WorkspaceModel):
 
         id = file_item.serverFileDict["_id"]
         modelId = file_item.serverFileDict["modelId"]
-        logger.debug(f"Doing a delete on file {id} with modelId {modelId}")
+        logger.debug("Doing a delete on file %s with modelId %s", id, modelId)
 
         self.apiClient.deleteFile(file_item.serverFileDict["_id"])
         self.refreshModel()
@@ -655,8 +800,8 @@ class ServerWorkspaceModel(WorkspaceModel):
         for file_item in self.files:
             if file_item.status == FileStatus.UNTRACKED:
                 logger.debug(
-                    f"Upload untracked file {file_item.name} "
-                    "from uploadUntrackedFiles()"
+                    "Upload untracked file %s from uploadUntrackedFiles()",
+                    file_item.name,
                 )
                 self.upload(file_item.name)
                 refreshRequired = True
@@ -745,6 +890,20 @@ class ServerWorkspaceModel(WorkspaceModel):
 
 
 class FileItem:
+    # a model holds an item per file, slots keep them small
+    __slots__ = (
+        "name",
+        "ext",
+        "path",
+        "is_folder",
+        "versions",
+        "current_version",
+        "createdAt",
+        "updatedAt",
+        "status",
+        "serverFileDict",
+    )
+
     def __init__(
         self,
         name,
@@ -6,6 +6,7 @@
 
 
 import os
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 import re
 
@@ -92,6 +93,8 @@ logger = Utils.getLogger(__name__)
 MAX_LENGTH_BASE_FILENAME = 30
 MAX_LENGTH_WORKSPACE_NAME = 33
 ELLIPSES = "..."
+# number of files that are copied at the same time into a workspace
+MAX_COPY_WORKERS = 4
 MAX_INT32 = (1 << 31) - 1
 CONFIG_PATH = FreeCAD.getUserConfigDir()
 FILENAME_USER_CFG = "user.cfg"
@@ -719,11 +722,7 @@ class WorkspaceView(QtWidgets.QScrollArea):
                     break
                 # Check if the request was successful (201 status code)
                 if self.api.access_token is not None:
-                    loginData = {
-                        "accessToken": self.api.access_token,
-                        "user": self.api.user,
-                    }
-                    p.SetString("loginData", json.dumps(loginData))
+                    self.store_login_data()
                     self.set_ui_connectionStatus()
                     self.leaveWorkspace()
                     self.workspacesModel.refreshModel()
@@ -739,6 +738,18 @@ class WorkspaceView(QtWidgets.QScrollArea):
                 break  # Exit the login loop if the dialog is canceled
         self.set_ui_connectionStatus()
 
+    def store_login_data(self):
+        loginData = {
+            "accessToken": self.api.access_token,
+            "user": self.api.user,
+        }
+        p.SetString("loginData", json.dumps(loginData))
+
+    def token_renewed(self):
+        """Called by the API client after it renewed the access token."""
+        self.store_login_data()
+        self.set_token_expiration_timer(self.api.access_token)
+
     def disconnect(self):
         self.api.disconnect()
         self.set_ui_connectionStatus()
@@ -785,6 +796,10 @@ class WorkspaceView(QtWidgets.QScrollArea):
 
             time_difference = expiration_time - current_time
             interval_milliseconds = max(0, time_difference.total_seconds() * 1000)
+            # a renewed token replaces the timer of the previous token
+            if getattr(self, "token_timer", None) is not None:
+                self.token_timer.stop()
+                self.token_timer = None
             if interval_milliseconds < MAX_INT32:
                 # Create a QTimer that triggers only once when the token is expired
                 self.token_timer = QtCore.QTimer()
@@ -2086,7 +2101,14 @@ class WorkspaceView(QtWidgets.QScrollArea):
             self.workspacesModel.refreshModel()
 
     def timerTick(self):
-        self.refreshModel()
+        # the periodic check should see the changes made elsewhere and should
+        # not block the UI while waiting for the server
+        if self.current_workspace is not None:
+            self.currentWorkspaceModel.refreshModelInBackground()
+            if not self.is_connected():
+                self.hideLinkVersionDetails()
+        else:
+            self.workspacesModel.refreshModel(useCache=False)
 
     # ####
     # Adding files and directories
@@ -2142,15 +2164,26 @@ class WorkspaceView(QtWidgets.QScrollArea):
         )
 
         wsm = self.currentWorkspaceModel
+        fullPath = wsm.getFullPath()
 
-        # copy selected files to destination folder
-        for fileUrl in selectedFiles:
-            fileName = os.path.basename(fileUrl)
-            destFileUrl = Utils.joinPath(wsm.getFullPath(), fileName)
-
+        def copyFile(fileUrl):
+            """Copy a file to the workspace, returns whether it succeeded."""
+            destFileUrl = Utils.joinPath(fullPath, os.path.basename(fileUrl))
             try:
                 shutil.copy(fileUrl, destFileUrl)
+                return True
             except (shutil.SameFileError, OSError):
+                return False
+
+        # copy selected files to destination folder, the copies overlap and
+        # the watcher of the model coalesces the changes into one refresh
+        with ThreadPoolExecutor(max_workers=MAX_COPY_WORKERS) as executor:
+            copied = list(executor.map(copyFile, selectedFiles))
+
+        # the warnings are shown in the GUI thread
+        for fileUrl, ok in zip(selectedFiles, copied):
+            if not ok:
+                fileName = os.path.basename(fileUrl)
                 QtGui.QMessageBox.warning(
                     None, "Error", "Failed to copy file " + fileName
                 )
@@ -3,6 +3,7 @@ import webbrowser
 
 import Utils
 import handlers
+from APIClient import DEFAULT_TIMEOUT
 from handlers import HandlerException
 from PySide.QtGui import QPixmap, QFrame, QIcon
 from PySide.QtCore import (
@@ -186,7 +187,7 @@ def get_pixmap_from_data(image_data):
 
 def get_image_data_from_url(thumbnailUrl):
     try:
-        response = requests.get(thumbnailUrl)
+        response = requests.get(thumbnailUrl, timeout=DEFAULT_TIMEOUT)
         return response.content
     except requests.exceptions.RequestException:
         pass  # no thumbnail online.
@@ -27,6 +27,7 @@ import FreeCAD as App
 import FreeCADGui as Gui
 import Part
 import Utils
+from APIClient import TRANSFER_TIMEOUT
 import datetime
 import os
 import requests
@@ -216,7 +217,8 @@ class ReloadableObject:
             url = url + "/download"
 
         try:
-            response = requests.get(url)
+            # STEP files can be large, allow as long as for other transfers
+            response = requests.get(url, timeout=TRANSFER_TIMEOUT)
             response.raise_for_status()
             # There are different viewpoints on what the content type should
             # be.  Currently we allow all content types and the code below is
@@ -34,6 +34,10 @@ class File:
     isSystemGenerated: Optional[bool] = field(default=False)
     directory: Optional[DirectorySummary] = field(default=None)
     workspace: Optional[WorkspaceSummary] = field(default=None)
+    # {version id: version}, built by get_version()
+    _version_index: Optional[dict] = field(
+        default=None, init=False, repr=False, compare=False
+    )
 
     def __post_init__(self):
         if self.model is not None:
@@ -50,6 +54,13 @@ class File:
             self.followingActiveSharedModels, ShareLinkSummary
         )
 
+    def get_version(self, version_id):
+        """Return the version with the given id or None if there is none."""
+        # the index is built once, files are often queried for several versions
+        if self._version_index is None:
+            self._version_index = {ver._id: ver for ver in self.versions or []}
+        return self._version_index.get(version_id)
+
     @classmethod
     def from_json(cls, json_data):
         return Utils.import_json_forgiving_of_extra_fields(cls, json_data)
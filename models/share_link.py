@@ -26,7 +26,7 @@ class Protection(StrEnum):
 
 
 # NOTE: this are called 'shared-models' in the API and database for legacy reasons
-@dataclass(order=True)
+@dataclass(order=True, slots=True)
 class ShareLink:
     _id: str
     createdAt: int
@@ -63,12 +63,18 @@ class ShareLink:
     # messagesParticipants: list[UserSummary] = field(default_factory=list, repr=False)
 
     def __post_init__(self):
-        self.model = Model(**self.model)
-        self.fileDetail = FileDetail(**self.fileDetail)
-        self.curation = Curation(**self.curation)
-        self.directSharedTo = Utils.convert_to_class_list(
-            self.directSharedTo, UserSummary
-        )
+        # the fields are already converted if the instance is created from
+        # another one, for example with dataclasses.replace()
+        if not isinstance(self.model, Model):
+            self.model = Model(**self.model)
+        if not isinstance(self.fileDetail, FileDetail):
+            self.fileDetail = FileDetail(**self.fileDetail)
+        if not isinstance(self.curation, Curation):
+            self.curation = Curation(**self.curation)
+        if self.directSharedTo and not isinstance(self.directSharedTo[0], UserSummary):
+            self.directSharedTo = Utils.convert_to_class_list(
+                self.directSharedTo, UserSummary
+            )
 
     @classmethod
     def from_json(cls, json_data):
@@ -83,9 +89,14 @@ class PublicShareLinkListModel(QAbstractListModel):
         super(PublicShareLinkListModel, self).__init__(*args, **kwargs)
         self.sharelink_list = sharelinks or []
 
+    def set_sharelinks(self, sharelinks):
+        self.beginResetModel()
+        self.sharelink_list = sharelinks
+        self.endResetModel()
+
     def data(self, index, role):
         if role == Qt.DisplayRole:
-            return self.sharelink_list[index.row()].name
+            return self.sharelink_list[index.row()].title
         elif role == self.ShareLinkRole:
             return self.sharelink_list[index.row()]
 
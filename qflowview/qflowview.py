@@ -116,6 +116,7 @@ class QFlowView(QScrollArea):
     def setModel(self, model: QAbstractListModel):
         self.fv_model = model
         self.fv_model.layoutChanged.connect(self.onLayoutChange)
+        self.fv_model.modelReset.connect(self.onLayoutChange)
         self._consider_setup()
 
     def onLayoutChange(self):
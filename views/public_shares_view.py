@@ -32,18 +32,15 @@ class PublicSharesView(QFlowView):
         QApplication.setOverrideCursor(QCursor(Qt.WaitCursor))
         api_result = fancy_handle(get_public_sharelink_items)
         if api_result == APICallResult.OK:
-            self.publicShareLinkListModel.sharelink_list = sharelinks
+            self.publicShareLinkListModel.set_sharelinks(sharelinks)
             self.parent.form.publicSharesStatusLabel.setText("Most recent shown first")
-            self.publicShareLinkListModel.layoutChanged.emit()
 
         elif api_result == APICallResult.DISCONNECTED:
             self.parent.form.publicSharesStatusLabel.setText("off-line")
-            self.publicShareLinkListModel.sharelink_list = []
-            self.publicShareLinkListModel.layoutChanged.emit()
+            self.publicShareLinkListModel.set_sharelinks([])
 
         else:
             # because public shares are public, .NOT_LOGGED_IN will never happen
             self.parent.form.publicSharesStatusLabel.setText("unexpected error")
-            self.publicShareLinkListModel.sharelink_list = []
-            self.publicShareLinkListModel.layoutChanged.emit()
+            self.publicShareLinkListModel.set_sharelinks([])
         QApplication.restoreOverrideCursor()